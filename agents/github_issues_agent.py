@@ -1,26 +1,73 @@
 from uuid import uuid4
-from typing import List, Optional
+import asyncio
+from typing import List, Optional, Tuple
 import re
 
 from models.a2a import (
     A2AMessage, TaskResult, TaskStatus, Artifact,
     MessagePart, MessageConfiguration
 )
-from utils.utils import fetch_issues
-import os
+from utils.utils import cached_fetch_issues, close_client, get_client
+import logging
 
+logger = logging.getLogger(__name__)
 
+# Cap on concurrent webhook deliveries; they share the GitHub client's
+# connection pool, so slow endpoints must not be able to exhaust it
+MAX_CONCURRENT_WEBHOOKS = 16
 
-import httpx
-import logging
+# Compiled once at import rather than looked up in re's cache per message
+_REPO_RE = re.compile(r"([\w\-_.]+)/([\w\-_.]+)")
+# github.com URLs (https or ssh), with an optional .git suffix; the repo ends
+# at any non-name character or at a sentence-ending period
+_URL_RE = re.compile(r"github\.com[/:]([\w\-_.]+)/([\w\-_.]+?)(?:\.git)?(?=[^\w.\-]|\.?(?:\s|$))")
 
-logger = logging.getLogger(__name__)
+
+def _parse_repo(text: str) -> Tuple[Optional[str], Optional[str]]:
+    """Extract (owner, repo) from a GitHub URL, an 'owner/repo' string or free text."""
+    m = _URL_RE.search(text) or _REPO_RE.search(text)
+    if m:
+        return m.group(1), m.group(2)
+    # fallback: try last two words separated by space
+    parts = text.split()
+    if len(parts) >= 2:
+        return parts[-2], parts[-1]
+    return None, None
 
 
 class GitHubIssuesAgent:
     def __init__(self):
-        # No external client required for simple GitHub REST fetches
+        # HTTP goes through the shared client in utils.utils
         self.conversations = {}
+        # In-flight webhook deliveries; holds references so tasks aren't GC'd
+        self._webhook_tasks = set()
+        self._webhook_sem = asyncio.Semaphore(MAX_CONCURRENT_WEBHOOKS)
+
+    @staticmethod
+    def _reply(state, text, task_id, context_id, messages, artifacts=None):
+        """Build the TaskResult for an agent text reply in the given state."""
+        response_message = A2AMessage(
+            role="agent",
+            parts=[MessagePart(kind="text", text=text)],
+            taskId=task_id
+        )
+
+        return TaskResult(
+            id=task_id,
+            contextId=context_id,
+            status=TaskStatus(
+                state=state,
+                message=response_message
+            ),
+            artifacts=artifacts or [],
+            history=messages + [response_message]
+        )
+
+    async def cleanup(self):
+        """Wait for pending webhook deliveries, then release the shared HTTP client."""
+        if self._webhook_tasks:
+            await asyncio.gather(*self._webhook_tasks, return_exceptions=True)
+        await close_client()
 
     async def send_to_webhook(self, webhook_url, token, issues_result, authentication=None):
         """
@@ -61,16 +108,19 @@ class GitHubIssuesAgent:
             headers["Authorization"] = f"{scheme} {token}"
 
         logger.info("Sending webhook to %s", webhook_url)
-        async with httpx.AsyncClient() as client:
-            try:
+        # Reuse the shared pooled client so deliveries to the same host skip
+        # a fresh TCP+TLS handshake
+        client = get_client()
+        try:
+            async with self._webhook_sem:
                 resp = await client.post(webhook_url, json=webhook_payload, headers=headers, timeout=60.0)
-                resp.raise_for_status()
-                logger.info("Webhook delivered successfully to %s (status=%s)", webhook_url, resp.status_code)
-                return True
-            except Exception as e:
-                # Log or handle webhook delivery failure as needed
-                logger.exception("Failed to deliver webhook to %s: %s \n webhook_payload: %s \n headers %s", webhook_url, e, webhook_payload, headers)
-                return False
+            resp.raise_for_status()
+            logger.info("Webhook delivered successfully to %s (status=%s)", webhook_url, resp.status_code)
+            return True
+        except Exception as e:
+            # Log or handle webhook delivery failure as needed
+            logger.exception("Failed to deliver webhook to %s: %s \n webhook_payload: %s \n headers %s", webhook_url, e, webhook_payload, headers)
+            return False
 
     async def process_messages(
         self,
@@ -110,94 +160,47 @@ class GitHubIssuesAgent:
 
         if not text:
             error_msg = "Please provide a repository in the form 'owner/repo' or a sentence mentioning the repository."
-            response_message = A2AMessage(
-                role="agent",
-                parts=[MessagePart(kind="text", text=error_msg)],
-                taskId=task_id
-            )
-
-            return TaskResult(
-                id=task_id,
-                contextId=context_id,
-                status=TaskStatus(
-                    state="completed",
-                    message=response_message
-                ),
-                artifacts=[],
-                history=messages + [response_message]
-            )
+            return self._reply("completed", error_msg, task_id, context_id, messages)
 
         # Try to parse owner/repo
-        m = re.search(r"([\w\-_.]+)/([\w\-_.]+)", text)
-        owner = repo = None
-        if m:
-            owner, repo = m.group(1), m.group(2)
-        else:
-            # fallback: try last two words separated by space
-            parts = text.split()
-            if len(parts) >= 2:
-                owner, repo = parts[-2], parts[-1]
+        owner, repo = _parse_repo(text)
 
         if not owner or not repo:
             error_msg = (
                 "Could not determine repository owner and name. Please provide in the format 'owner/repo'."
             )
-            response_message = A2AMessage(
-                role="agent",
-                parts=[MessagePart(kind="text", text=error_msg)],
-                taskId=task_id
-            )
-
-            return TaskResult(
-                id=task_id,
-                contextId=context_id,
-                status=TaskStatus(
-                    state="completed",
-                    message=response_message
-                ),
-                artifacts=[],
-                history=messages + [response_message]
-            )
+            return self._reply("completed", error_msg, task_id, context_id, messages)
 
         # Fetch issues
         try:
-            issues_result = fetch_issues(owner, repo)
+            issues_result = await cached_fetch_issues(owner, repo)
 
             if "error" in issues_result:
                 response_text = f"Error fetching issues: {issues_result['error']}"
-                response_message = A2AMessage(
-                    role="agent",
-                    parts=[MessagePart(kind="text", text=response_text)],
-                    taskId=task_id
-                )
-
-                return TaskResult(
-                    id=task_id,
-                    contextId=context_id,
-                    status=TaskStatus(
-                        state="failed",
-                        message=response_message
-                    ),
-                    artifacts=[],
-                    history=messages + [response_message]
-                )
+                return self._reply("failed", response_text, task_id, context_id, messages)
 
             # If pushNotificationConfig is present, send issues to webhook
             webhook_cfg = None
             if config and hasattr(config, "pushNotificationConfig") and config.pushNotificationConfig:
                 webhook_cfg = config.pushNotificationConfig
             if webhook_cfg and webhook_cfg.url:
-                await self.send_to_webhook(
+                # Deliver in the background so the RPC reply isn't held up by
+                # the webhook endpoint
+                task = asyncio.create_task(self.send_to_webhook(
                     webhook_url=webhook_cfg.url,
                     token=webhook_cfg.token,
                     issues_result=issues_result,
                     authentication=getattr(webhook_cfg, "authentication", None)
-                )
+                ))
+                self._webhook_tasks.add(task)
+                task.add_done_callback(self._webhook_tasks.discard)
 
             # Build a short textual summary
             count = issues_result.get("count", 0)
             issues = issues_result.get("issues", [])
             summary_lines = [f"Repository: {owner}/{repo}", f"Open issues fetched: {count}"]
+            if issues_result.get("truncated"):
+                summary_lines.append("(partial list: page limit or GitHub rate limit reached)")
 
             top_n = min(5, len(issues))
             if top_n > 0:
@@ -211,12 +214,6 @@ class GitHubIssuesAgent:
 
             assistant_text = "\n".join(summary_lines)
 
-            response_message = A2AMessage(
-                role="agent",
-                parts=[MessagePart(kind="text", text=assistant_text)],
-                taskId=task_id
-            )
-
             artifacts = [
                 Artifact(
                     name="issues_data",
@@ -224,37 +221,11 @@ class GitHubIssuesAgent:
                 )
             ]
 
-            full_history = messages + [response_message]
-
             # Save conversation history (simple append)
             self.conversations[context_id] = history
 
-            return TaskResult(
-                id=task_id,
-                contextId=context_id,
-                status=TaskStatus(
-                    state="completed",
-                    message=response_message
-                ),
-                artifacts=artifacts,
-                history=full_history
-            )
+            return self._reply("completed", assistant_text, task_id, context_id, messages, artifacts=artifacts)
 
         except Exception as e:
             error_msg = f"An error occurred while fetching issues: {str(e)}"
-            response_message = A2AMessage(
-                role="agent",
-                parts=[MessagePart(kind="text", text=error_msg)],
-                taskId=task_id
-            )
-
-            return TaskResult(
-                id=task_id,
-                contextId=context_id,
-                status=TaskStatus(
-                    state="failed",
-                    message=response_message
-                ),
-                artifacts=[],
-                history=messages + [response_message]
-            )
+            return self._reply("failed", error_msg, task_id, context_id, messages)
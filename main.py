@@ -1,7 +1,9 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 from dotenv import load_dotenv
+import asyncio
+import orjson
 import os
 import logging
 import sys
@@ -22,6 +24,10 @@ logger = logging.getLogger(__name__)
 # Initialize GitHub issues agent
 github_agent = None
 
+# Cap on requests processed by the agent at once, so bursts of RPCs don't fan
+# out unbounded GitHub traffic
+MAX_CONCURRENT_REQUESTS = int(os.getenv("MAX_CONCURRENT_REQUESTS", 32))
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -31,6 +37,7 @@ async def lifespan(app: FastAPI):
     # Initialize GitHub issues agent
     logger.info("Initializing GitHubIssuesAgent")
     github_agent = GitHubIssuesAgent()
+    app.state.gh_sem = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
     
     yield
     
@@ -44,7 +51,8 @@ app = FastAPI(
     title="GitHub Issues Agent A2A",
     description="An agent to fetch GitHub repository issues via A2A JSON-RPC",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse
 )
 
 
@@ -61,10 +69,10 @@ async def health_check():
 async def issues_endpoint(request: Request):
     """Endpoint to fetch GitHub issues via the GitHubIssuesAgent A2A flow"""
     try:
-        body = await request.json()
+        body = orjson.loads(await request.body())
 
         if body.get("jsonrpc") != "2.0" or "id" not in body:
-            return JSONResponse(
+            return ORJSONResponse(
                 status_code=400,
                 content={
                     "jsonrpc": "2.0",
@@ -76,7 +84,7 @@ async def issues_endpoint(request: Request):
                 }
             )
 
-        rpc_request = JSONRPCRequest(**body)
+        rpc_request = JSONRPCRequest.model_validate(body)
 
         messages = []
         context_id = None
@@ -91,22 +99,24 @@ async def issues_endpoint(request: Request):
             context_id = rpc_request.params.contextId
             task_id = rpc_request.params.taskId
 
-        result = await github_agent.process_messages(
-            messages=messages,
-            context_id=context_id,
-            task_id=task_id,
-            config=config
-        )
+        async with request.app.state.gh_sem:
+            result = await github_agent.process_messages(
+                messages=messages,
+                context_id=context_id,
+                task_id=task_id,
+                config=config
+            )
 
         response = JSONRPCResponse(
             id=rpc_request.id,
             result=result
         )
 
-        return response.model_dump()
+        # Returning a Response directly skips FastAPI's jsonable_encoder walk
+        return ORJSONResponse(content=response.model_dump())
 
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=500,
             content={
                 "jsonrpc": "2.0",
@@ -8,7 +8,8 @@ fetch_issues_json = {
             "owner": {"type": "string", "description": "Repository owner (user or organization)"},
             "repo": {"type": "string", "description": "Repository name"},
             "state": {"type": "string", "description": "Issue state: open, closed, or all", "default": "open"},
-            "per_page": {"type": "integer", "description": "Number of issues to return (max 100)", "default": 30}
+            "per_page": {"type": "integer", "description": "Number of issues per page (max 100)", "default": 100},
+            "max_pages": {"type": "integer", "description": "Maximum number of pages to fetch (default 5)"}
         },
         "required": ["owner", "repo"]
     }
@@ -1,7 +1,12 @@
 from utils.data import fetch_issues_json
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+import asyncio
 import os
+import time
 import httpx
 import json
+import orjson
 import re
 
 
@@ -11,7 +16,167 @@ tools = [
 ]
 
 
-def handle_tool_calls(tool_calls):
+# Shared client so repeated fetches reuse pooled connections instead of
+# paying a new TCP+TLS handshake per call. HTTP/2 lets concurrent page
+# fetches multiplex over a single connection to api.github.com. It is also
+# used for webhook deliveries, so the GitHub token is sent per request rather
+# than set as a default header.
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared AsyncClient, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+    return _client
+
+
+async def close_client():
+    """Close the shared AsyncClient (called on app shutdown)."""
+    global _client
+    if _client is not None and not _client.is_closed:
+        await _client.aclose()
+    _client = None
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the GitHub rate limit is exhausted and won't reset soon."""
+
+
+class RateLimiter:
+    """
+    Track GitHub's ``X-RateLimit-*`` headers and hold requests when the
+    budget runs low.
+
+    Once fewer than ``threshold`` requests remain, callers sleep until the
+    reset time if it is within ``max_wait`` seconds. Otherwise they spend
+    what is left, and once it reaches zero they fail fast instead of making
+    calls that are certain to return 403. A ``Retry-After`` on a 403/429
+    (secondary rate limit) is tracked separately and only delays callers
+    until that deadline.
+    """
+
+    def __init__(self, threshold: int = 10, max_wait: float = 60.0):
+        self.threshold = threshold
+        self.max_wait = max_wait
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+        self.retry_until = 0.0
+
+    def update(self, resp: httpx.Response):
+        """Record the budget reported by a GitHub response."""
+        remaining = resp.headers.get("X-RateLimit-Remaining", "")
+        reset = resp.headers.get("X-RateLimit-Reset", "")
+        if remaining.isdigit():
+            self.remaining = int(remaining)
+        if reset.isdigit():
+            self.reset_at = float(reset)
+
+        retry_after = resp.headers.get("Retry-After", "")
+        if resp.status_code in (403, 429) and retry_after.isdigit():
+            self.retry_until = max(self.retry_until, time.time() + int(retry_after))
+
+    async def wait(self):
+        """Block (or raise RateLimitExceeded) until a request may be sent."""
+        delay = self.retry_until - time.time()
+        if delay > self.max_wait:
+            raise RateLimitExceeded(f"GitHub asked to retry after {int(delay)}s")
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        if self.remaining is None or self.remaining >= self.threshold:
+            return
+
+        delay = self.reset_at - time.time()
+        if delay <= 0:
+            self.remaining = None
+            return
+        if delay <= self.max_wait:
+            await asyncio.sleep(delay)
+            self.remaining = None
+            return
+        if self.remaining == 0:
+            raise RateLimitExceeded(f"GitHub rate limit exceeded; resets in {int(delay)}s")
+
+
+# REST and GraphQL are metered separately by GitHub
+rest_limiter = RateLimiter()
+graphql_limiter = RateLimiter()
+
+
+# Upper bound on in-flight page requests for a single REST fetch
+MAX_CONCURRENT_PAGES = 8
+# Default page cap for the unauthenticated REST path, which GitHub limits to
+# 60 requests per hour
+REST_MAX_PAGES = 5
+# Default page cap for GraphQL; cursor pages are fetched one after another,
+# so each extra page adds a full round-trip to the RPC
+GRAPHQL_MAX_PAGES = 5
+
+
+def _last_page(resp: httpx.Response) -> int:
+    """Read the page number of the rel="last" Link header (1 if absent)."""
+    last = resp.links.get("last", {}).get("url")
+    if not last:
+        return 1
+    page = parse_qs(urlparse(last).query).get("page", ["1"])[0]
+    return int(page) if page.isdigit() else 1
+
+
+# Last ETag and simplified issues per (url, state, per_page, page). GitHub
+# answers a matching If-None-Match with 304 and no body, so unchanged pages
+# skip the download and JSON parse. This path is unauthenticated, and GitHub
+# only waives the rate-limit charge for 304s on authorized requests, so these
+# still count toward the 60/hour budget.
+_ETAG_CACHE_SIZE = 512
+_etag_cache: dict = {}
+
+
+async def _get_page(client: httpx.AsyncClient, url: str, headers: dict, params: dict):
+    """
+    GET one page of issues, revalidating against the ETag cache.
+
+    Pull requests are dropped and issues are reduced with ``_simplify_issue``
+    before caching, so the cache holds only the fields we return.
+
+    Returns (status_code, issues, last_page, response); issues is None on
+    non-200/304.
+    """
+    key = (url, params.get("state"), params.get("per_page"), params.get("page"))
+    cached = _etag_cache.get(key)
+    if cached:
+        headers = {**headers, "If-None-Match": cached[0]}
+
+    await rest_limiter.wait()
+    resp = await client.get(url, headers=headers, params=params)
+    rest_limiter.update(resp)
+
+    if resp.status_code == 304 and cached:
+        return 200, list(cached[1]), cached[2], resp
+    if resp.status_code != 200:
+        return resp.status_code, None, 1, resp
+
+    # skip pull requests
+    issues = [
+        _simplify_issue(i) for i in orjson.loads(resp.content)
+        if isinstance(i, dict) and not i.get("pull_request")
+    ]
+    last = _last_page(resp)
+    etag = resp.headers.get("ETag")
+    if etag:
+        _etag_cache.pop(key, None)
+        if len(_etag_cache) >= _ETAG_CACHE_SIZE:
+            _etag_cache.pop(next(iter(_etag_cache)))
+        _etag_cache[key] = (etag, issues, last)
+    return 200, list(issues), last, resp
+
+
+async def handle_tool_calls(tool_calls):
     """Handle tool calls from OpenAI"""
     results = []
     for tool_call in tool_calls:
@@ -19,7 +184,7 @@ def handle_tool_calls(tool_calls):
         arguments = json.loads(tool_call.function.arguments)
 
         tool = globals().get(tool_name)
-        result = tool(**arguments) if tool else {}
+        result = await tool(**arguments) if tool else {}
 
         results.append({
             "role": "tool",
@@ -32,15 +197,152 @@ def handle_tool_calls(tool_calls):
 
 
 
-def fetch_issues(owner: str, repo: str, state: str = "open", per_page: int = 30) -> dict:
+GRAPHQL_URL = "https://api.github.com/graphql"
+
+_ISSUES_QUERY = """
+query($owner: String!, $repo: String!, $states: [IssueState!], $first: Int!, $cursor: String) {
+  repository(owner: $owner, name: $repo) {
+    issues(first: $first, after: $cursor, states: $states, orderBy: {field: CREATED_AT, direction: DESC}) {
+      pageInfo { hasNextPage endCursor }
+      nodes {
+        number title body state createdAt updatedAt url
+        author { login }
+        labels(first: 100) { nodes { name } }
+        comments { totalCount }
+      }
+    }
+  }
+}
+"""
+
+_GRAPHQL_STATES = {"open": ["OPEN"], "closed": ["CLOSED"], "all": ["OPEN", "CLOSED"]}
+
+
+async def graphql_fetch_issues(owner: str, repo: str, token: str, state: str = "open", per_page: int = 100, max_pages: int = GRAPHQL_MAX_PAGES) -> dict:
+    """
+    Fetch issues through the GitHub GraphQL API.
+
+    Only the fields we return are requested and each page of up to 100
+    issues costs a single rate-limit point. Pull requests are not part of
+    the ``issues`` connection, so no filtering is needed. Stops after
+    ``max_pages`` pages and sets ``truncated`` if more remain. A failure
+    after the first page also returns the pages fetched so far with
+    ``truncated`` set.
+
+    Returns the same shape as ``fetch_issues``.
     """
-    Fetch issues for a GitHub repository using the public GitHub REST API.
+    headers = {"Authorization": f"bearer {token}"}
+    variables = {
+        "owner": owner,
+        "repo": repo,
+        "states": _GRAPHQL_STATES.get(state, ["OPEN"]),
+        "first": max(1, min(per_page, 100)),
+        "cursor": None,
+    }
+
+    client = get_client()
+    simplified = []
+    truncated = False
+    pages = 0
+    while True:
+        try:
+            await graphql_limiter.wait()
+            resp = await client.post(GRAPHQL_URL, headers=headers, json={"query": _ISSUES_QUERY, "variables": variables})
+        except (RateLimitExceeded, httpx.HTTPError):
+            if not pages:
+                raise
+            # keep the pages already fetched
+            truncated = True
+            break
+        graphql_limiter.update(resp)
+
+        error = None
+        repository = None
+        if resp.status_code != 200:
+            error = f"GitHub API returned {resp.status_code}: {resp.text}"
+        else:
+            payload = orjson.loads(resp.content)
+            repository = (payload.get("data") or {}).get("repository")
+            if payload.get("errors"):
+                error = "; ".join(e.get("message", "") for e in payload["errors"])
+            elif repository is None:
+                error = f"Repository {owner}/{repo} not found"
+
+        if error:
+            if not pages:
+                return {"error": error}
+            truncated = True
+            break
+
+        conn = repository["issues"]
+        for n in conn["nodes"]:
+            simplified.append({
+                "id": n.get("number"),
+                "title": n.get("title"),
+                "state": (n.get("state") or "").lower(),
+                "created_at": n.get("createdAt"),
+                "updated_at": n.get("updatedAt"),
+                "comments": n["comments"]["totalCount"],
+                "labels": [lab["name"] for lab in n["labels"]["nodes"]],
+                "user": (n.get("author") or {}).get("login"),
+                "url": n.get("url"),
+                "body": (n.get("body") or "")[:500]
+            })
+
+        pages += 1
+        page_info = conn["pageInfo"]
+        if not page_info["hasNextPage"]:
+            break
+        if max_pages and pages >= max_pages:
+            truncated = True
+            break
+        variables["cursor"] = page_info["endCursor"]
+
+    return {"owner": owner, "repo": repo, "count": len(simplified), "truncated": truncated, "issues": simplified}
+
+
+def _simplify_issue(i: dict) -> dict:
+    """Reduce a REST issue object to the fields returned by fetch_issues."""
+    get = i.get
+    labels = get("labels")
+    return {
+        "id": get("number"),
+        "title": get("title"),
+        "state": get("state"),
+        "created_at": get("created_at"),
+        "updated_at": get("updated_at"),
+        "comments": get("comments"),
+        "labels": [lab["name"] for lab in labels] if labels else [],
+        "user": (get("user") or {}).get("login"),
+        "url": get("html_url"),
+        "body": (get("body") or "")[:500]
+    }
+
+
+async def fetch_issues(owner: str, repo: str, state: str = "open", per_page: int = 100, max_pages: Optional[int] = None) -> dict:
+    """
+    Fetch issues for a GitHub repository.
+
+    When ``GITHUB_TOKEN`` is set the GraphQL API is used (see
+    ``graphql_fetch_issues``); GraphQL requires authentication, so without a
+    token this falls back to the public REST API.
+
+    The first page is requested to discover the total page count from the
+    ``Link`` header; the remaining pages are then fetched concurrently, at
+    most ``MAX_CONCURRENT_PAGES`` at a time. No more than ``max_pages``
+    (default ``REST_MAX_PAGES``) pages are requested, nor more than the rate
+    limit budget left after page 1. If a page fails, the pages before it are
+    returned with ``truncated`` set. Each page is revalidated with
+    ``If-None-Match`` so unchanged pages come back as a 304 and are served
+    from the ETag cache.
 
     Args:
         owner: repo owner (user or org)
         repo: repo name
         state: issue state filter (open, closed, all)
-        per_page: number of issues to return (max 100)
+        per_page: number of issues per page (max 100)
+        max_pages: maximum number of pages to fetch (default
+            ``GRAPHQL_MAX_PAGES`` or ``REST_MAX_PAGES``)
 
     Returns a dict with simplified issue information or an error key on failure.
     """
@@ -48,39 +350,100 @@ def fetch_issues(owner: str, repo: str, state: str = "open", per_page: int = 30)
         if not owner or not repo:
             return {"error": "Both owner and repo must be provided."}
 
-        url = f"https://api.github.com/repos/{owner}/{repo}/issues"
-        headers = {"Accept": "application/vnd.github.v3+json"}
         token = os.getenv("GITHUB_TOKEN")
         if token:
-            headers["Authorization"] = f"token {token}"
+            return await graphql_fetch_issues(owner, repo, token, state=state, per_page=per_page, max_pages=max_pages or GRAPHQL_MAX_PAGES)
+
+        url = f"https://api.github.com/repos/{owner}/{repo}/issues"
+        headers = {"Accept": "application/vnd.github.v3+json"}
 
+        client = get_client()
         params = {"state": state, "per_page": per_page}
-        resp = httpx.get(url, headers=headers, params=params, timeout=10.0)
+        status, issues, last, resp = await _get_page(client, url, headers, {**params, "page": 1})
 
-        if resp.status_code != 200:
-            return {"error": f"GitHub API returned {resp.status_code}: {resp.text}"}
+        if status != 200:
+            return {"error": f"GitHub API returned {status}: {resp.text}"}
 
-        issues = resp.json()
-        simplified = []
-        for i in issues:
-            # skip pull requests
-            if isinstance(i, dict) and i.get("pull_request"):
-                continue
+        limit = min(last, max_pages or REST_MAX_PAGES)
+        if rest_limiter.remaining is not None:
+            limit = min(limit, 1 + rest_limiter.remaining)
+        truncated = limit < last
 
-            simplified.append({
-                "id": i.get("number"),
-                "title": i.get("title"),
-                "state": i.get("state"),
-                "created_at": i.get("created_at"),
-                "updated_at": i.get("updated_at"),
-                "comments": i.get("comments"),
-                "labels": [lab.get("name") for lab in i.get("labels", [])],
-                "user": i.get("user", {}).get("login"),
-                "url": i.get("html_url"),
-                "body": (i.get("body") or "")[:500]
-            })
+        if limit > 1:
+            sem = asyncio.Semaphore(MAX_CONCURRENT_PAGES)
+
+            async def get_page(page):
+                async with sem:
+                    try:
+                        return await _get_page(client, url, headers, {**params, "page": page})
+                    except (RateLimitExceeded, httpx.HTTPError):
+                        return None, None, 1, None
+
+            pages = await asyncio.gather(*(get_page(page) for page in range(2, limit + 1)))
+            for status, page_issues, _, _ in pages:
+                # keep a contiguous run of pages so the result stays ordered
+                if status != 200:
+                    truncated = True
+                    break
+                issues.extend(page_issues)
 
-        return {"owner": owner, "repo": repo, "count": len(simplified), "issues": simplified}
+        return {"owner": owner, "repo": repo, "count": len(issues), "truncated": truncated, "issues": issues}
 
+    except RateLimitExceeded as e:
+        return {"error": str(e)}
     except Exception as e:
         return {"error": f"An unexpected error occurred: {str(e)}"}
+
+
+
+# Short-lived cache of successful fetch_issues results so concurrent or
+# back-to-back requests for the same repo share one GitHub round-trip.
+ISSUES_CACHE_TTL = 60.0
+_ISSUES_CACHE_SIZE = 1024
+_issues_cache: dict = {}
+# In-flight fetch per key, shared by every caller that misses the cache
+_inflight: dict = {}
+
+
+def _store_issues(key, result):
+    """Insert into the issues cache, purging expired and excess entries."""
+    _issues_cache.pop(key, None)
+    # entries share one TTL and are kept in insertion order, so expired ones
+    # are always at the front
+    now = time.monotonic()
+    while _issues_cache:
+        oldest = next(iter(_issues_cache))
+        if _issues_cache[oldest][0] > now and len(_issues_cache) < _ISSUES_CACHE_SIZE:
+            break
+        del _issues_cache[oldest]
+    _issues_cache[key] = (now + ISSUES_CACHE_TTL, result)
+
+
+async def cached_fetch_issues(owner: str, repo: str, state: str = "open", per_page: int = 100) -> dict:
+    """
+    ``fetch_issues`` behind a per-(owner, repo) TTL cache.
+
+    Concurrent misses for the same key await a single in-flight fetch
+    instead of all hitting GitHub; they all receive its result, including
+    an error, but error results are not cached.
+    """
+    key = (owner.lower(), repo.lower(), state, per_page)
+
+    hit = _issues_cache.get(key)
+    if hit and hit[0] > time.monotonic():
+        return hit[1]
+
+    task = _inflight.get(key)
+    if task is None:
+        task = asyncio.ensure_future(fetch_issues(owner, repo, state=state, per_page=per_page))
+        _inflight[key] = task
+
+        def _done(t):
+            _inflight.pop(key, None)
+            if not t.cancelled() and "error" not in t.result():
+                _store_issues(key, t.result())
+
+        task.add_done_callback(_done)
+
+    # shield so one caller being cancelled doesn't cancel the shared fetch
+    return await asyncio.shield(task)